@@ -14,19 +14,40 @@ Utilise les modèles gratuits OpenRouter et AutoGen local.
 """
 
 import os
+import re
 import json
+import asyncio
 import logging
 import requests
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import time
 import schedule
 import threading
 import sys
+import copy
+import hashlib
+import shelve
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict, deque, namedtuple
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur json
+    orjson = None
+from prompt_toolkit import PromptSession
+from prompt_toolkit.patch_stdout import patch_stdout
 
 # AutoGen imports
 import autogen
-from autogen import ConversableAgent, GroupChat, GroupChatManager
+import openai
+from autogen import GroupChat, GroupChatManager
 
 # Google Sheets imports
 import gspread
@@ -38,28 +59,427 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 # Configuration du logging
+# Les messages passent par une file : le thread de surveillance ne bloque
+# jamais sur l'écriture terminal, un seul listener s'en charge.
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Journal des recherches (une entrée JSON par ligne)
+RESEARCH_LOG_FILE = "research_log.jsonl"
+RESEARCH_LOG_MAX_ENTRIES = 100
+RESEARCH_LOG_MAX_BYTES = 256 * 1024
+
+# Cache persistant des réponses LLM
+LLM_CACHE_PATH = os.path.join(".cache", "llm_cache.db")
+LLM_CACHE_TTL = 3600
+LLM_CACHE_MAX_ENTRIES = 2048  # Taille maximale du cache sur disque
+
+# Durée de validité de l'instantané des projets en mémoire (secondes)
+PROJECTS_CACHE_TTL = 30
+
+# Nombre maximal d'analyses de santé mémorisées par agent
+HEALTH_CACHE_MAX_ENTRIES = 1024
+
+# Prompts système des rôles, injectés à chaque appel du client LLM partagé
+PROMPT_RECHERCHE = """Tu es un expert en recherche d'informations et analyse de projets.
+
+Tes compétences :
+- Analyser les requêtes de recherche et projets
+- Structurer l'information de manière logique
+- Identifier les points critiques et opportunités
+- Proposer des solutions pratiques
+- Faire des recommandations basées sur les données
+
+Format de réponse :
+## 🔍 ANALYSE
+[Ton analyse détaillée]
+
+## 📊 POINTS CLÉS
+[Liste des éléments importants]
+
+## 🎯 RECOMMANDATIONS
+[Actions concrètes à entreprendre]
+
+## ⚠ ALERTES
+[Risques ou points d'attention]
+
+Sois précis, factuel et orienté solution."""
+
+PROMPT_REDACTEUR = """Tu es un assistant personnel expert en communication et gestion de projets.
+
+Ton rôle :
+- Reformuler les analyses en langage clair et actionnable
+- Prioriser les informations selon leur importance
+- Créer des résumés engageants et motivants
+- Proposer des plans d'action concrets
+- Adapter le ton selon le contexte (urgent, informatif, encourageant)
+
+Tu dois toujours :
+- Commencer par un résumé exécutif
+- Utiliser des emojis pour structurer
+- Être bienveillant mais direct
+- Proposer des actions concrètes
+- Inclure des échéances si pertinent
+
+Format de réponse :
+## 🎯 RÉSUMÉ EXÉCUTIF
+[Synthèse en 2-3 phrases]
+
+## 📋 PLAN D'ACTION
+[Étapes concrètes à suivre]
+
+## 🔔 RAPPELS
+[Ce qu'il faut retenir]"""
+
+PROMPT_PLANIFICATEUR = """Tu es un expert en planification et suivi de projets.
+
+Tes spécialités :
+- Analyser les deadlines et priorités
+- Détecter les blocages et retards
+- Proposer des réajustements de planning
+- Optimiser l'allocation des ressources
+- Anticiper les risques
+
+Tu dois toujours :
+- Évaluer la faisabilité des délais
+- Identifier les dépendances entre tâches
+- Proposer des alternatives en cas de blocage
+- Calculer les impacts sur le planning global
+
+Format de réponse :
+## 📅 ANALYSE PLANNING
+[Évaluation des délais et contraintes]
+
+## 🚨 ALERTES TIMING
+[Deadlines critiques ou retards]
+
+## 🔄 RÉAJUSTEMENTS
+[Propositions d'optimisation]"""
+
+# Rôle -> (prompt système, modèle, température)
+ROLES = {
+    'recherche': (PROMPT_RECHERCHE, "meta-llama/llama-3.1-8b-instruct:free", 0.3),
+    'redacteur': (PROMPT_REDACTEUR, "microsoft/wizardlm-2-8x22b:free", 0.7),
+    'planificateur': (PROMPT_PLANIFICATEUR, "google/gemma-2-9b-it:free", 0.4),
+}
+
+# Mots-clés déclenchant l'analyse planning
+PLANNING_TRIGGERS_RE = re.compile(r'\b(deadline|planning|délai|échéance)s?\b', re.IGNORECASE)
+
+# Première ligne d'analyse mentionnant une action (plus de 10 caractères)
+ACTION_LINE_RE = re.compile(r'^(?=.{11}).*action.*$', re.IGNORECASE | re.MULTILINE)
+
+# Format attendu des deadlines (testé avant conversion pour éviter les exceptions)
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Intentions simples du chat traitées localement, sans appel au modèle
+CHAT_INTENT_RE = re.compile(r'^\s*(aide|help|liste|statut)\s*$', re.IGNORECASE)
+
+AIDE_CHAT = """Commandes disponibles :
+- rechercher [query] : Rechercher des informations
+- ajouter : Ajouter un nouveau projet
+- projet [nom] : Chercher un projet spécifique
+- rapport : Générer un rapport quotidien
+- projets : Lister tous les projets
+- statut : Nombre de projets par statut
+- quit : Quitter"""
+
+# Correspondance statut -> compteur du rapport quotidien
+STATUT_COMPTEURS = {
+    'En cours': 'en_cours',
+    'À faire': 'a_faire',
+    'Terminé': 'termines',
+    'Bloqué': 'bloques',
+}
+
+# Emoji affiché devant chaque statut dans la liste des projets
+STATUS_EMOJI = {'En cours': '🔄', 'À faire': '📋', 'Terminé': '✅', 'Bloqué': '🚫'}
+
+# Codes numériques des statuts pour le calcul vectorisé des scores de santé
+STATUT_CODES = {'À faire': 0, 'En cours': 1, 'Bloqué': 2, 'Terminé': 3}
+
+# Problèmes détectés par compute_health_scores (bits du masque de drapeaux)
+HEALTH_STAGNATION_CRITIQUE = 1
+HEALTH_STAGNATION_MODEREE = 2
+HEALTH_BLOQUE = 4
+HEALTH_RETARD = 8
+HEALTH_DEADLINE_PROCHE = 16
+HEALTH_PROGRESSION_FAIBLE = 32
+
+# Règles du score de santé, partagées par _score_project et compute_health_scores
+STAGNATION_CRITIQUE_JOURS = 14   # au-delà : stagnation critique
+STAGNATION_MODEREE_JOURS = 7     # au-delà : stagnation modérée
+DEADLINE_PROCHE_JOURS = 3        # deadline dans 0 à 3 jours
+PROGRESSION_FAIBLE_PCT = 25      # projet en cours sous ce pourcentage
+HEALTH_PENALTIES = {
+    HEALTH_STAGNATION_CRITIQUE: 30,
+    HEALTH_STAGNATION_MODEREE: 15,
+    HEALTH_BLOQUE: 40,
+    HEALTH_RETARD: 50,
+    HEALTH_DEADLINE_PROCHE: 20,
+    HEALTH_PROGRESSION_FAIBLE: 10,
+}
+
+# Recommandations associées à chaque type de problème
+STAGNATION_RECS = (
+    "📞 Planifier une réunion d'équipe pour débloquer le projet",
+    "🔄 Revoir les objectifs et priorités",
+)
+BLOCAGE_RECS = (
+    "🚫 Identifier les blocages et les ressources nécessaires",
+    "🤝 Escalader auprès des parties prenantes",
+)
+RETARD_RECS = (
+    "⏱ Revoir le planning et les livrables",
+    "📊 Prioriser les tâches critiques",
+)
+PROGRESSION_RECS = (
+    "🎯 Décomposer en sous-tâches plus petites",
+    "📈 Définir des jalons intermédiaires",
+)
+
+
+@lru_cache(maxsize=1024)
+def _fast_parse_ymd(value: str) -> Optional[int]:
+    """
+    Convertit une deadline YYYY-MM-DD en numéro de jour (date.toordinal)
+
+    Découpage direct de la chaîne, bien plus rapide que strptime.
+    Retourne None si la valeur est absente ou invalide.
+    """
+    if not DATE_RE.match(value):
+        return None
+    try:
+        return date(int(value[0:4]), int(value[5:7]), int(value[8:10])).toordinal()
+    except ValueError:
+        return None
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """Sérialise en JSON avec orjson si disponible (UTF-8 conservé), sinon json"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+
+def _compress(text: Any, max_chars: int = 600) -> str:
+    """
+    Réduit une réponse d'agent à ses lignes structurées (titres ## et puces -)
+
+    Args:
+        text: Réponse brute de l'agent
+        max_chars: Taille maximale du résumé
+    
+    Returns:
+        Résumé compact transmis à l'étape suivante
+    """
+    if not text:
+        return ""
+    text = str(text)
+    lines = [line.strip() for line in text.splitlines()]
+    kept = [line for line in lines if line.startswith(('##', '-'))]
+    return ("\n".join(kept) if kept else text)[:max_chars]
+
+
+class LLMCache:
+    """Cache LRU en mémoire des réponses LLM, avec expiration"""
+
+    def __init__(self, maxsize: int = 512, ttl: int = LLM_CACHE_TTL):
+        """
+        Args:
+            maxsize: Nombre maximal de réponses conservées
+            ttl: Durée de validité par défaut d'une réponse (secondes)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, ttl: Optional[int] = None) -> Optional[Any]:
+        """Retourne la réponse associée à la clé, ou None si absente ou expirée"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key: str, value: Any, timestamp: Optional[float] = None):
+        """Mémorise une réponse en évinçant la moins récemment utilisée si besoin"""
+        with self._lock:
+            self._data[key] = (time.time() if timestamp is None else timestamp, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class SemanticCache:
+    """
+    Cache sémantique des réponses (Redis + index vectoriel RediSearch)
+
+    Les questions sont encodées par un petit modèle d'embeddings : une
+    question suffisamment proche d'une question déjà traitée (similarité
+    cosinus >= seuil) renvoie la réponse mémorisée sans appel au LLM.
+    Seules les entrées de même portée (scope) sont comparées : le contexte
+    qui a servi à générer la réponse en fait partie.
+    Dépendances optionnelles : redis, sentence-transformers.
+    """
+
+    INDEX = "idx:semantic_cache:v2"
+    PREFIX = "semcache:v2:"
+    DIM = 384
+    MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+    def __init__(self, redis_url: str, threshold: float = 0.92, ttl: int = LLM_CACHE_TTL):
+        """
+        Args:
+            redis_url: URL du serveur Redis (avec le module RediSearch)
+            threshold: Similarité cosinus minimale pour un hit
+            ttl: Durée de vie d'une réponse (secondes)
+        """
+        import redis
+        from sentence_transformers import SentenceTransformer
+        
+        self.threshold = threshold
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(redis_url)
+        self._model = SentenceTransformer(self.MODEL_NAME)  # chargé une seule fois
+        self._ensure_index()
+    
+    def _ensure_index(self):
+        """Crée l'index HNSW s'il n'existe pas encore"""
+        from redis.exceptions import ResponseError
+        from redis.commands.search.field import TagField, TextField, VectorField
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+        
+        try:
+            self._redis.ft(self.INDEX).info()
+        except ResponseError:
+            self._redis.ft(self.INDEX).create_index(
+                [
+                    TagField("scope"),
+                    TextField("response"),
+                    VectorField("vec", "HNSW", {
+                        "TYPE": "FLOAT32", "DIM": self.DIM, "DISTANCE_METRIC": "COSINE"
+                    }),
+                ],
+                definition=IndexDefinition(prefix=[self.PREFIX], index_type=IndexType.HASH)
+            )
+    
+    def _embed(self, text: str) -> bytes:
+        return self._model.encode(text, normalize_embeddings=True).astype('float32').tobytes()
+    
+    @staticmethod
+    def _scope_tag(scope: str) -> str:
+        """Portée réduite à un tag hexadécimal (aucun caractère à échapper)"""
+        return hashlib.blake2b(scope.encode("utf-8"), digest_size=8).hexdigest()
+    
+    def get(self, text: str, scope: str = "") -> Optional[str]:
+        """Retourne la réponse d'une question proche dans la même portée, ou None"""
+        from redis.commands.search.query import Query
+        
+        try:
+            query = (
+                Query("@scope:{$scope} @vec:[VECTOR_RANGE $radius $vec]=>{$YIELD_DISTANCE_AS: dist}")
+                .sort_by("dist")
+                .return_fields("response", "dist")
+                .paging(0, 1)
+                .dialect(2)
+            )
+            result = self._redis.ft(self.INDEX).search(
+                query, query_params={
+                    "scope": self._scope_tag(scope), "radius": 1 - self.threshold, "vec": self._embed(text)
+                }
+            )
+            if not result.docs:
+                return None
+            response = result.docs[0].response
+            return response.decode("utf-8") if isinstance(response, bytes) else response
+        except Exception as e:
+            logger.error(f"❌ Erreur cache sémantique : {e}")
+            return None
+    
+    def set(self, text: str, response: str, scope: str = ""):
+        """Mémorise la réponse associée à une question dans une portée"""
+        try:
+            tag = self._scope_tag(scope)
+            key = self.PREFIX + tag + ":" + hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            self._redis.hset(key, mapping={
+                "scope": tag, "vec": self._embed(text), "response": response, "ts": time.time()
+            })
+            self._redis.expire(key, self.ttl)
+        except Exception as e:
+            logger.error(f"❌ Erreur cache sémantique : {e}")
+
+
+class _ProjectAccess:
+    """Accès aux lignes de projet par nom de colonne, comme un dict"""
+    __slots__ = ()
+    _columns: Dict[str, str] = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, self._columns[key])
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Ligne sous forme de dict {en-tête: valeur} (sérialisable en JSON)"""
+        return {h: getattr(self, f) for h, f in self._columns.items() if not h.startswith('_')}
+
 
 class AgentChefProjet:
     """Agent IA Chef de Projet - Système complet de gestion"""
     
-    def _init_(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json"):
         """
         Initialise l'agent avec la configuration
         
         Args:
             config_path: Chemin vers le fichier de configuration
         """
+        # Caches et structures dérivées, alloués une seule fois
+        self.projects_cache = []
+        self._cache_ts: Optional[float] = None
+        self._sheet_rev = 0  # Incrémenté à chaque écriture ou relecture de la feuille
+        # Santé des projets par (nom, jour), valable pour la révision _health_rev
+        self._health_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._health_rev = -1
+        # (projets, DataFrame) remplacés ensemble : les deux vues restent alignées
+        self._snapshot: Tuple[List[Any], pd.DataFrame] = ([], pd.DataFrame())
+        self._headers: Optional[List[str]] = None
+        self._project_cls: Optional[type] = None
+        self._llm_cache = LLMCache(maxsize=512, ttl=LLM_CACHE_TTL)
+        self._llm_lock = threading.Lock()
+        self._llm_store = self._open_llm_store()
+        self._headers_checked = False
+        
+        # La connexion Google Sheets est ouverte au premier accès à self.sheet
         self.config = self._load_config(config_path)
         self.setup_agents()
-        self.setup_google_sheets()
-        self.projects_cache = {}
-        self.last_update = None
+        self._semantic_cache = self._open_semantic_cache()
         
         # Démarrer le système de surveillance
         self.start_monitoring()
@@ -80,12 +500,18 @@ class AgentChefProjet:
                 "check_interval_hours": 24,
                 "stagnation_alert_days": 7,
                 "urgent_alert_days": 14
+            },
+            "semantic_cache": {
+                "redis_url": os.getenv("REDIS_URL", ""),
+                "threshold": 0.92,
+                "ttl_seconds": LLM_CACHE_TTL
             }
         }
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            with open(config_path, 'rb') as f:
+                raw = f.read()
+                config = orjson.loads(raw) if orjson else json.loads(raw)
                 # Fusionner avec la config par défaut
                 default_config.update(config)
                 return default_config
@@ -93,141 +519,174 @@ class AgentChefProjet:
             logger.info(f"Config file not found, using default config")
             # Créer le fichier de config par défaut
             with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(default_config, f, indent=2)
+                f.write(_dumps(default_config, indent=True))
             return default_config
     
     def setup_agents(self):
-        """Configure les agents IA spécialisés"""
+        """Configure le client LLM partagé par les rôles recherche, rédacteur et planificateur"""
         
-        # Configuration commune
-        base_config = {
-            "api_key": self.config["openrouter_api_key"],
-            "base_url": "https://openrouter.ai/api/v1",
-            "max_tokens": 1000,
-        }
-        
-        # 🔍 Agent Recherche - Spécialisé dans la recherche et l'analyse
-        self.agent_recherche = ConversableAgent(
-            name="AgentRecherche",
-            system_message="""Tu es un expert en recherche d'informations et analyse de projets.
-            
-            Tes compétences :
-            - Analyser les requêtes de recherche et projets
-            - Structurer l'information de manière logique
-            - Identifier les points critiques et opportunités
-            - Proposer des solutions pratiques
-            - Faire des recommandations basées sur les données
-            
-            Format de réponse :
-            ## 🔍 ANALYSE
-            [Ton analyse détaillée]
-            
-            ## 📊 POINTS CLÉS
-            [Liste des éléments importants]
-            
-            ## 🎯 RECOMMANDATIONS
-            [Actions concrètes à entreprendre]
-            
-            ## ⚠ ALERTES
-            [Risques ou points d'attention]
-            
-            Sois précis, factuel et orienté solution.""",
-            llm_config={**base_config, "model": "meta-llama/llama-3.1-8b-instruct:free", "temperature": 0.3},
-            human_input_mode="NEVER",
-            max_consecutive_auto_reply=1,
+        # Un seul client (et un seul pool de connexions) pour tous les rôles :
+        # le prompt système, le modèle et la température sont fournis à chaque appel
+        self.llm = autogen.OpenAIWrapper(
+            config_list=[{
+                "api_key": self.config["openrouter_api_key"],
+                "base_url": "https://openrouter.ai/api/v1",
+            }],
+            max_tokens=1000,
+            cache_seed=None,  # Cache géré par _call
         )
         
-        # 📝 Agent Rédacteur - Spécialisé dans la synthèse et communication
-        self.agent_redacteur = ConversableAgent(
-            name="AgentRedacteur",
-            system_message="""Tu es un assistant personnel expert en communication et gestion de projets.
-            
-            Ton rôle :
-            - Reformuler les analyses en langage clair et actionnable
-            - Prioriser les informations selon leur importance
-            - Créer des résumés engageants et motivants
-            - Proposer des plans d'action concrets
-            - Adapter le ton selon le contexte (urgent, informatif, encourageant)
-            
-            Tu dois toujours :
-            - Commencer par un résumé exécutif
-            - Utiliser des emojis pour structurer
-            - Être bienveillant mais direct
-            - Proposer des actions concrètes
-            - Inclure des échéances si pertinent
-            
-            Format de réponse :
-            ## 🎯 RÉSUMÉ EXÉCUTIF
-            [Synthèse en 2-3 phrases]
-            
-            ## 📋 PLAN D'ACTION
-            [Étapes concrètes à suivre]
-            
-            ## 🔔 RAPPELS
-            [Ce qu'il faut retenir]""",
-            llm_config={**base_config, "model": "microsoft/wizardlm-2-8x22b:free", "temperature": 0.7},
-            human_input_mode="NEVER",
-            max_consecutive_auto_reply=1,
-        )
+        logger.info("✅ Agents IA configurés avec succès")
+    
+    def _open_llm_store(self) -> Optional[shelve.Shelf]:
+        """Ouvre le cache persistant des réponses LLM, purgé de ses entrées expirées"""
+        try:
+            os.makedirs(os.path.dirname(LLM_CACHE_PATH), exist_ok=True)
+            store = shelve.open(LLM_CACHE_PATH)
+        except Exception as e:
+            logger.error(f"❌ Erreur ouverture cache LLM : {e}")
+            return None
         
-        # 🤖 Agent Planificateur - Spécialisé dans la planification et suivi
-        self.agent_planificateur = ConversableAgent(
-            name="AgentPlanificateur",
-            system_message="""Tu es un expert en planification et suivi de projets.
-            
-            Tes spécialités :
-            - Analyser les deadlines et priorités
-            - Détecter les blocages et retards
-            - Proposer des réajustements de planning
-            - Optimiser l'allocation des ressources
-            - Anticiper les risques
-            
-            Tu dois toujours :
-            - Évaluer la faisabilité des délais
-            - Identifier les dépendances entre tâches
-            - Proposer des alternatives en cas de blocage
-            - Calculer les impacts sur le planning global
-            
-            Format de réponse :
-            ## 📅 ANALYSE PLANNING
-            [Évaluation des délais et contraintes]
-            
-            ## 🚨 ALERTES TIMING
-            [Deadlines critiques ou retards]
-            
-            ## 🔄 RÉAJUSTEMENTS
-            [Propositions d'optimisation]""",
-            llm_config={**base_config, "model": "google/gemma-2-9b-it:free", "temperature": 0.4},
-            human_input_mode="NEVER",
-            max_consecutive_auto_reply=1,
-        )
+        try:
+            self._prune_llm_store(store)
+        except Exception as e:
+            logger.warning(f"⚠ Purge du cache LLM impossible : {e}")
+        return store
+    
+    @staticmethod
+    def _prune_llm_store(store: shelve.Shelf):
+        """
+        Supprime les réponses expirées et ne garde que les
+        LLM_CACHE_MAX_ENTRIES plus récentes
+        """
+        now = time.time()
+        timestamps = {key: store[key][0] for key in list(store.keys())}
+        expired = [key for key, ts in timestamps.items() if now - ts >= LLM_CACHE_TTL]
+        for key in expired:
+            del timestamps[key]
+        overflow = sorted(timestamps, key=timestamps.get)[:max(0, len(timestamps) - LLM_CACHE_MAX_ENTRIES)]
         
-        logger.info("✅ Agents IA configurés avec succès")
+        for key in expired + overflow:
+            del store[key]
+        if expired or overflow:
+            # Récupère l'espace libéré quand le backend dbm le permet (dbm.gnu)
+            reorganize = getattr(store.dict, 'reorganize', None)
+            if reorganize:
+                reorganize()
+            store.sync()
+            logger.info(f"🧹 Cache LLM : {len(expired) + len(overflow)} entrées supprimées")
     
-    def setup_google_sheets(self):
-        """Configure la connexion à Google Sheets"""
+    def _open_semantic_cache(self) -> Optional[SemanticCache]:
+        """Active le cache sémantique si un serveur Redis est configuré"""
+        settings = self.config.get("semantic_cache", {})
+        if not settings.get("redis_url"):
+            return None
+        
         try:
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                self.config["google_creds_path"], scope
+            return SemanticCache(
+                settings["redis_url"],
+                threshold=settings.get("threshold", 0.92),
+                ttl=settings.get("ttl_seconds", LLM_CACHE_TTL)
             )
-            
-            self.gc = gspread.authorize(creds)
-            self.sheet = self.gc.open(self.config["sheet_name"]).sheet1
-            
-            # Configurer les en-têtes avec votre structure
-            self.setup_sheet_headers()
-            
+        except Exception as e:
+            logger.warning(f"⚠ Cache sémantique désactivé : {e}")
+            return None
+    
+    def _llm_cache_key(self, model: str, messages: List[Dict[str, Any]]) -> str:
+        """Calcule la clé de cache (modèle, prompt)"""
+        payload = model + json.dumps(messages, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _llm_cache_get(self, key: str, ttl: int) -> Optional[Any]:
+        """Retourne la réponse en cache si elle n'a pas expiré"""
+        reply = self._llm_cache.get(key, ttl)
+        if reply is None and self._llm_store is not None:
+            with self._llm_lock:
+                entry = self._llm_store.get(key)
+                if entry is not None and time.time() - entry[0] >= ttl:
+                    # Entrée expirée : supprimée plutôt que conservée indéfiniment
+                    del self._llm_store[key]
+                    entry = None
+            if entry is not None:
+                self._llm_cache.set(key, entry[1], timestamp=entry[0])
+                reply = entry[1]
+        return reply
+    
+    def _llm_cache_set(self, key: str, reply: Any):
+        """Mémorise une réponse LLM en mémoire et sur disque"""
+        self._llm_cache.set(key, reply)
+        if self._llm_store is not None:
+            with self._llm_lock:
+                self._llm_store[key] = (time.time(), reply)
+                self._llm_store.sync()
+    
+    def _call(self, role: str, user: str, ttl: int = LLM_CACHE_TTL, cache: bool = True) -> str:
+        """
+        Interroge le modèle associé à un rôle, en réutilisant les réponses déjà obtenues
+        
+        Args:
+            role: Rôle à utiliser ('recherche', 'redacteur' ou 'planificateur')
+            user: Message utilisateur
+            ttl: Durée de validité d'une réponse en cache (secondes)
+            cache: False pour forcer un nouvel appel au modèle
+        
+        Returns:
+            Réponse texte du modèle
+        """
+        prompt, model, temperature = ROLES[role]
+        # Prompt système statique en tête, marqué comme point de cache (prompt caching OpenRouter)
+        messages = [
+            {"role": "system", "content": [
+                {"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}
+            ]},
+            {"role": "user", "content": user}
+        ]
+        
+        key = self._llm_cache_key(model, messages)
+        if cache:
+            reply = self._llm_cache_get(key, ttl)
+            if reply is not None:
+                return reply
+        
+        response = self.llm.create(messages=messages, model=model, temperature=temperature)
+        details = getattr(getattr(response, "usage", None), "prompt_tokens_details", None)
+        if details is not None:
+            logger.debug(f"🧮 {role}: {getattr(details, 'cached_tokens', 0)} tokens de prompt servis depuis le cache")
+        reply = self.llm.extract_text_or_completion_object(response)[0]
+        if reply:
+            self._llm_cache_set(key, reply)
+        return reply
+    
+    @cached_property
+    def gc(self) -> gspread.Client:
+        """Client Google Sheets, authentifié au premier accès"""
+        scope = [
+            'https://spreadsheets.google.com/feeds',
+            'https://www.googleapis.com/auth/drive'
+        ]
+        
+        creds = ServiceAccountCredentials.from_json_keyfile_name(
+            self.config["google_creds_path"], scope
+        )
+        return gspread.authorize(creds)
+    
+    @cached_property
+    def sheet(self) -> gspread.Worksheet:
+        """Feuille des projets, ouverte au premier accès"""
+        try:
+            sheet = self.gc.open(self.config["sheet_name"]).sheet1
             logger.info("✅ Connexion Google Sheets établie")
-            
+            return sheet
         except Exception as e:
             logger.error(f"❌ Erreur Google Sheets : {e}")
             raise
     
+    def _ensure_headers(self):
+        """Vérifie les en-têtes une seule fois, avant la première écriture"""
+        if not self._headers_checked:
+            self.setup_sheet_headers()
+            self._headers_checked = True
+    
     def setup_sheet_headers(self):
         """Configure les en-têtes selon votre structure"""
         headers = [
@@ -238,17 +697,27 @@ class AgentChefProjet:
         
         try:
             existing_headers = self.sheet.row_values(1)
-            if not existing_headers or existing_headers != headers:
-                self.sheet.clear()
-                self.sheet.insert_row(headers, 1)
-                logger.info("📋 En-têtes configurés")
+            if existing_headers == headers:
+                return
+            
+            # Réécrire uniquement la ligne d'en-têtes, en vidant les anciennes colonnes en trop
+            row = headers + [''] * (len(existing_headers) - len(headers))
+            self.sheet.update(
+                range_name=f"A1:{gspread.utils.rowcol_to_a1(1, len(row))}",
+                values=[row],
+                value_input_option='RAW'
+            )
+            logger.info("📋 En-têtes configurés")
         except Exception as e:
             logger.error(f"❌ Erreur en-têtes : {e}")
     
-    def rechercher_information(self, query: str, project_context: str = "") -> Dict[str, Any]:
+    async def rechercher_information(self, query: str, project_context: str = "") -> Dict[str, Any]:
         """
         Effectue une recherche d'information avec analyse par les agents
         
+        Les analyses recherche et planning étant indépendantes, elles sont
+        lancées en parallèle avant la synthèse finale.
+        
         Args:
             query: Requête de recherche
             project_context: Contexte du projet (optionnel)
@@ -263,40 +732,43 @@ class AgentChefProjet:
             context = f"""
             Requête de recherche : {query}
             Contexte du projet : {project_context}
-            Date : {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            Date : {datetime.now().strftime('%Y-%m-%d')}
             
             Analyse cette requête et fournis une recherche approfondie.
             """
             
+            # Une requête déjà traitée réutilise les réponses du cache LLM (_call) :
+            # la date fait partie du contexte, donc de la clé
             # Étape 1 : Analyse par l'agent recherche
-            recherche_result = self.agent_recherche.generate_reply(
-                messages=[{"role": "user", "content": context}]
-            )
-            
-            # Étape 2 : Planification si nécessaire
-            if any(word in query.lower() for word in ['deadline', 'planning', 'délai', 'échéance']):
-                planning_result = self.agent_planificateur.generate_reply(
-                    messages=[{"role": "user", "content": f"Analyse planning pour : {recherche_result}"}]
+            recherche_task = asyncio.to_thread(self._call, 'recherche', context)
+            
+            # Étape 2 : Planification si nécessaire, en parallèle de la recherche
+            if PLANNING_TRIGGERS_RE.search(query):
+                planning_task = asyncio.to_thread(
+                    self._call, 'planificateur', f"""
+                    Analyse planning pour : {query}
+                    Contexte du projet : {project_context}
+                    """
                 )
+                recherche_result, planning_result = await asyncio.gather(recherche_task, planning_task)
             else:
+                recherche_result = await recherche_task
                 planning_result = ""
             
-            # Étape 3 : Synthèse finale
+            # Étape 3 : Synthèse finale, à partir des seules lignes structurées des analyses
             synthesis_context = f"""
             Recherche effectuée : {query}
             
             Analyse de recherche :
-            {recherche_result}
+            {_compress(recherche_result)}
             
             Analyse planning :
-            {planning_result}
+            {_compress(planning_result)}
             
             Synthétise cette information pour l'utilisateur.
             """
             
-            final_result = self.agent_redacteur.generate_reply(
-                messages=[{"role": "user", "content": synthesis_context}]
-            )
+            final_result = await asyncio.to_thread(self._call, 'redacteur', synthesis_context)
             
             # Sauvegarder la recherche
             self.save_research_log(query, final_result, project_context)
@@ -336,9 +808,33 @@ class AgentChefProjet:
             Résultat de l'ajout
         """
         try:
+            self._ensure_headers()
+            
+            # Préparer les données pour Google Sheets
+            current_date = datetime.now().strftime("%Y-%m-%d")
+            
+            # Projet simple (courte description, sans deadline, priorité basse) : pas d'analyse IA
+            if len(description) < 50 and not deadline and priorite >= 3:
+                row_data = [
+                    nom_projet, "À faire", priorite, description, "Analyser les besoins",
+                    "", current_date, current_date, 0, "", 0, notes
+                ]
+                self._append_project_row(row_data)
+                logger.info(f"✅ Projet ajouté (sans analyse) : {nom_projet}")
+                
+                return {
+                    "nom_projet": nom_projet,
+                    "status": "success",
+                    "analysis": "",
+                    "planning": "",
+                    "summary": "Projet simple : prochaine action « Analyser les besoins ».",
+                    "timestamp": datetime.now().isoformat()
+                }
+            
             # Analyser le projet avec l'agent recherche
-            project_analysis = self.agent_recherche.generate_reply(
-                messages=[{"role": "user", "content": f"""
+            project_analysis = self._call(
+                'recherche',
+                f"""
                 Analyse ce nouveau projet :
                 
                 Nom : {nom_projet}
@@ -348,42 +844,36 @@ class AgentChefProjet:
                 Notes : {notes}
                 
                 Propose une première action et identifie les risques potentiels.
-                """}]
+                """
             )
             
             # Obtenir des recommandations de planification
-            planning_advice = self.agent_planificateur.generate_reply(
-                messages=[{"role": "user", "content": f"""
+            planning_advice = self._call(
+                'planificateur',
+                f"""
                 Nouveau projet à planifier :
                 {project_analysis}
                 
                 Évalue la faisabilité du délai et propose un plan d'action.
-                """}]
+                """
             )
             
             # Synthèse finale
-            project_summary = self.agent_redacteur.generate_reply(
-                messages=[{"role": "user", "content": f"""
+            project_summary = self._call(
+                'redacteur',
+                f"""
                 Synthétise l'analyse de ce nouveau projet :
                 
                 Analyse : {project_analysis}
                 Planning : {planning_advice}
                 
                 Fournis un résumé actionnable pour démarrer le projet.
-                """}]
+                """
             )
             
-            # Préparer les données pour Google Sheets
-            current_date = datetime.now().strftime("%Y-%m-%d")
-            
             # Extraire la première action recommandée
-            prochaine_action = "Analyser les besoins"  # Valeur par défaut
-            if "action" in project_analysis.lower():
-                lines = project_analysis.split('\n')
-                for line in lines:
-                    if "action" in line.lower() and len(line) > 10:
-                        prochaine_action = line.strip()[:100]
-                        break
+            match = ACTION_LINE_RE.search(project_analysis)
+            prochaine_action = match.group(0).strip()[:100] if match else "Analyser les besoins"
             
             row_data = [
                 nom_projet,
@@ -401,10 +891,7 @@ class AgentChefProjet:
             ]
             
             # Ajouter à la feuille
-            self.sheet.append_row(row_data)
-            
-            # Mettre à jour le cache
-            self.refresh_projects_cache()
+            self._append_project_row(row_data)
             
             logger.info(f"✅ Projet ajouté : {nom_projet}")
             
@@ -426,6 +913,18 @@ class AgentChefProjet:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _append_project_row(self, row_data: List[Any]):
+        """Ajoute une ligne de projet et invalide le cache"""
+        self.sheet.append_rows(
+            [row_data],
+            value_input_option='USER_ENTERED',
+            insert_data_option='INSERT_ROWS'
+        )
+        
+        # Le cache sera rechargé à la prochaine lecture
+        self._cache_ts = None
+        self._sheet_rev += 1
+    
     def mettre_a_jour_projet(self, nom_projet: str, **kwargs) -> Dict[str, Any]:
         """
         Met à jour un projet existant
@@ -438,14 +937,10 @@ class AgentChefProjet:
             Résultat de la mise à jour
         """
         try:
-            # Trouver le projet
-            projects = self.get_all_projects()
-            project_row = None
+            self._ensure_headers()
             
-            for i, project in enumerate(projects, 2):  # Ligne 2 = premier projet
-                if project.get('Nom_Projet') == nom_projet:
-                    project_row = i
-                    break
+            # Trouver le projet
+            project_row = self._find_project_row(nom_projet)
             
             if not project_row:
                 return {
@@ -460,13 +955,26 @@ class AgentChefProjet:
                 'deadline': 6, 'notes': 12
             }
             
-            # Mettre à jour les champs
+            # Mettre à jour les champs (une seule requête pour toutes les cellules)
+            data = []
             for field, value in kwargs.items():
                 if field.lower() in columns:
-                    self.sheet.update_cell(project_row, columns[field.lower()], value)
+                    data.append({
+                        'range': gspread.utils.rowcol_to_a1(project_row, columns[field.lower()]),
+                        'values': [[value]]
+                    })
             
             # Mettre à jour la date de dernière MAJ
-            self.sheet.update_cell(project_row, 8, datetime.now().strftime("%Y-%m-%d"))
+            data.append({
+                'range': gspread.utils.rowcol_to_a1(project_row, 8),
+                'values': [[datetime.now().strftime("%Y-%m-%d")]]
+            })
+            
+            self.sheet.batch_update(data, value_input_option='USER_ENTERED')
+            
+            # Invalider le cache après écriture
+            self._cache_ts = None
+            self._sheet_rev += 1
             
             # Analyser la mise à jour
             update_context = f"""
@@ -476,9 +984,7 @@ class AgentChefProjet:
             Analyse cette mise à jour et fournis des recommandations.
             """
             
-            update_analysis = self.agent_redacteur.generate_reply(
-                messages=[{"role": "user", "content": update_context}]
-            )
+            update_analysis = self._call('redacteur', update_context)
             
             logger.info(f"✅ Projet mis à jour : {nom_projet}")
             
@@ -498,15 +1004,201 @@ class AgentChefProjet:
                 "error": str(e)
             }
     
-    def get_all_projects(self) -> List[Dict[str, Any]]:
-        """Récupère tous les projets"""
+    def _cache_is_fresh(self) -> bool:
+        """Indique si le cache des projets est encore valide"""
+        return bool(
+            self.projects_cache and self._cache_ts is not None
+            and time.monotonic() - self._cache_ts < PROJECTS_CACHE_TTL
+        )
+    
+    def _find_project_row(self, nom_projet: str) -> Optional[int]:
+        """
+        Retrouve la ligne d'un projet dans la feuille, avant une écriture
+        
+        Relit toujours la colonne des noms (une seule colonne plutôt que la
+        feuille entière) : la feuille a pu être triée ou modifiée depuis le
+        dernier instantané, et un numéro de ligne périmé écraserait un autre projet.
+        
+        Args:
+            nom_projet: Nom du projet recherché
+        
+        Returns:
+            Numéro de ligne (1 = en-têtes) ou None si introuvable
+        """
+        noms = self.sheet.col_values(1)
+        try:
+            return noms.index(nom_projet, 1) + 1
+        except ValueError:
+            return None
+    
+    def get_all_projects(self) -> List[Any]:
+        """
+        Récupère tous les projets (depuis le cache si encore valide)
+        
+        La feuille entière est lue en un seul appel ; les analyses suivantes
+        travaillent sur cet instantané plutôt que de relire la feuille.
+        """
+        if self._cache_is_fresh():
+            return self.projects_cache
+        
         try:
-            return self.sheet.get_all_records()
+            projects = self._materialize_projects(self.sheet.get_all_values())
+            self._snapshot = (projects, self._build_dataframe(projects))
+            self.projects_cache = projects
+            self._cache_ts = time.monotonic()
+            self._sheet_rev += 1
+            return self.projects_cache
         except Exception as e:
             logger.error(f"❌ Erreur récupération projets : {e}")
             return []
     
-    def rechercher_projet(self, query: str) -> List[Dict[str, Any]]:
+    def _project_type(self, headers: List[str]) -> type:
+        """Retourne la classe de ligne (namedtuple) associée aux en-têtes"""
+        if headers != self._headers:
+            # Champs lisibles en attribut : 'Progression_%' -> p.Progression_pct
+            fields = [re.sub(r'\W', '_', h.replace('%', 'pct')) for h in headers] + ['search_blob', 'deadline_epoch']
+            row_type = namedtuple('ProjectRow', fields, rename=True)
+            columns = dict(zip(headers, row_type._fields))
+            columns.update({'_search_blob': 'search_blob', '_deadline_epoch': 'deadline_epoch'})
+            self._project_cls = type('Project', (_ProjectAccess, row_type), {
+                '__slots__': (),
+                '_columns': columns,
+            })
+            self._headers = headers
+        return self._project_cls
+    
+    def _materialize_projects(self, rows: List[List[str]]) -> List[Any]:
+        """
+        Convertit les valeurs brutes de la feuille en lignes de projet
+        
+        Chaque ligne est un namedtuple partageant la même structure (plus
+        compact qu'un dict par ligne), lisible aussi via p['Colonne'] et
+        p.get('Colonne').
+        
+        Args:
+            rows: Valeurs de get_all_values (ligne 1 = en-têtes)
+        
+        Returns:
+            Liste des projets
+        """
+        if not rows:
+            return []
+        
+        headers = rows[0]
+        project_cls = self._project_type(headers)
+        width = len(headers)
+        search_idx = [headers.index(f) for f in ('Nom_Projet', 'Description', 'Notes') if f in headers]
+        deadline_idx = headers.index('Deadline') if 'Deadline' in headers else None
+        
+        projects = []
+        for row in rows[1:]:
+            row = (row + [''] * (width - len(row)))[:width]
+            # Texte de recherche et deadline calculés une seule fois par chargement
+            search_blob = '\n'.join(row[i] for i in search_idx).lower()
+            deadline_epoch = _fast_parse_ymd(row[deadline_idx]) if deadline_idx is not None else None
+            projects.append(project_cls(*gspread.utils.numericise_all(row), search_blob, deadline_epoch))
+        return projects
+    
+    def _get_columns(self, cols: List[str]) -> List[Dict[str, Any]]:
+        """
+        Récupère uniquement certaines colonnes des projets
+        
+        Réutilise le cache s'il est encore valide, sinon lit les colonnes
+        demandées en un seul appel batch_get.
+        
+        Args:
+            cols: Lettres des colonnes à lire (ex. ['A', 'B'])
+        
+        Returns:
+            Liste de projets limités aux colonnes demandées
+        """
+        if self._cache_is_fresh():
+            headers = [self._headers[gspread.utils.a1_to_rowcol(f"{c}1")[1] - 1] for c in cols]
+            return [
+                {**{h: p.get(h, '') for h in headers}, '_deadline_epoch': p.deadline_epoch}
+                for p in self.projects_cache
+            ]
+        
+        try:
+            data = self.sheet.batch_get([f"{c}:{c}" for c in cols])
+            columns = [[row[0] if row else '' for row in col] for col in data]
+            headers = [col[0] if col else '' for col in columns]
+            n_rows = max((len(col) for col in columns), default=0)
+            deadline_idx = headers.index('Deadline') if 'Deadline' in headers else None
+            
+            projects = []
+            for i in range(1, n_rows):
+                values = [col[i] if i < len(col) else '' for col in columns]
+                project = dict(zip(headers, gspread.utils.numericise_all(values)))
+                project['_deadline_epoch'] = _fast_parse_ymd(values[deadline_idx]) if deadline_idx is not None else None
+                projects.append(project)
+            return projects
+        except Exception as e:
+            logger.error(f"❌ Erreur récupération colonnes {cols} : {e}")
+            return []
+    
+    def _build_dataframe(self, projects: List[Any]) -> pd.DataFrame:
+        """
+        Construit la vue tabulaire des projets utilisée pour les calculs vectorisés
+        
+        Les colonnes reprennent les en-têtes de la feuille ; les colonnes
+        numériques et le statut sont typés une fois pour toutes.
+        """
+        if not self._headers:
+            return pd.DataFrame()
+        
+        df = pd.DataFrame.from_records(
+            projects, columns=self._headers + ['_search_blob', '_deadline_epoch']
+        )
+        if 'Statut' in df:
+            df['Statut'] = df['Statut'].astype('category')
+        if 'Progression_%' in df:
+            df['Progression_%'] = pd.to_numeric(df['Progression_%'], errors='coerce').fillna(0).astype('float32')
+        if 'Jours_Stagnation' in df:
+            df['Jours_Stagnation'] = pd.to_numeric(df['Jours_Stagnation'], errors='coerce').fillna(0).astype('float64')
+        return df
+    
+    def get_projects_snapshot(self) -> Tuple[List[Any], pd.DataFrame]:
+        """
+        Liste des projets et vue tabulaire correspondante, issues du même instantané
+        
+        Si la lecture échoue (liste vide) ou si l'instantané a été remplacé
+        entre-temps par un autre thread, la vue est reconstruite à partir de
+        la liste retournée : ligne i du DataFrame = projects[i].
+        """
+        projects = self.get_all_projects()
+        snapshot = self._snapshot
+        if snapshot[0] is not projects:
+            return projects, self._build_dataframe(projects)
+        return snapshot
+    
+    def cached_health(self, project_name: str, compute: Callable[[int], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Santé d'un projet, mémorisée par (nom, jour) pour la révision courante
+        
+        Args:
+            project_name: Nom du projet
+            compute: Calcul de la santé, appelé avec le jour courant (ordinal)
+                si aucun résultat n'est mémorisé
+        
+        Returns:
+            Copie du résultat : un appelant qui la modifie n'altère pas le cache
+        """
+        self.get_all_projects()  # Rafraîchit l'instantané, et donc la révision, si expiré
+        
+        # Feuille modifiée ou relue : les analyses mémorisées sont périmées
+        if self._health_rev != self._sheet_rev or len(self._health_cache) >= HEALTH_CACHE_MAX_ENTRIES:
+            self._health_cache.clear()
+            self._health_rev = self._sheet_rev
+        
+        key = (project_name, date.today().toordinal())
+        health = self._health_cache.get(key)
+        if health is None:
+            health = compute(key[1])
+            self._health_cache[key] = health
+        return copy.deepcopy(health)
+    
+    def rechercher_projet(self, query: str) -> List[Any]:
         """
         Recherche un projet spécifique
         
@@ -514,51 +1206,42 @@ class AgentChefProjet:
             query: Terme de recherche
             
         Returns:
-            Liste des projets correspondants
+            Liste des projets correspondants (lignes namedtuple, lisibles
+            aussi via p['Colonne'] ; to_dict() pour une copie en dict)
         """
         projects = self.get_all_projects()
-        results = []
-        
         query_lower = query.lower()
         
-        for project in projects:
-            # Rechercher dans le nom, description et notes
-            if (query_lower in project.get('Nom_Projet', '').lower() or
-                query_lower in project.get('Description', '').lower() or
-                query_lower in project.get('Notes', '').lower()):
-                results.append(project)
-        
-        return results
+        # Rechercher dans le nom, description et notes
+        return [project for project in projects if query_lower in project.search_blob]
     
     def generer_rapport_quotidien(self) -> Dict[str, Any]:
         """Génère un rapport quotidien des projets"""
         try:
-            projects = self.get_all_projects()
-            
-            # Préparer les statistiques
-            stats = {
-                'total': len(projects),
-                'en_cours': len([p for p in projects if p.get('Statut') == 'En cours']),
-                'a_faire': len([p for p in projects if p.get('Statut') == 'À faire']),
-                'termines': len([p for p in projects if p.get('Statut') == 'Terminé']),
-                'bloques': len([p for p in projects if p.get('Statut') == 'Bloqué']),
-                'urgents': len([p for p in projects if '🚨' in p.get('Alerte', '')]),
-            }
+            # Nom, Statut, Priorité, Deadline, Alerte suffisent au rapport
+            projects = self._get_columns(['A', 'B', 'C', 'F', 'J'])
             
-            # Projets critiques
-            critiques = [p for p in projects if p.get('Priorité') == 1 and p.get('Statut') != 'Terminé']
+            # Préparer les statistiques, projets critiques et en retard en un seul passage
+            stats = {'total': len(projects), 'en_cours': 0, 'a_faire': 0,
+                     'termines': 0, 'bloques': 0, 'urgents': 0}
+            critiques, retards = [], []
+            today_epoch = date.today().toordinal()
             
-            # Projets en retard
-            today = datetime.now().date()
-            retards = []
             for p in projects:
-                if p.get('Deadline') and p.get('Statut') != 'Terminé':
-                    try:
-                        deadline = datetime.strptime(p['Deadline'], '%Y-%m-%d').date()
-                        if deadline < today:
-                            retards.append(p)
-                    except ValueError:
-                        pass
+                statut = p.get('Statut')
+                compteur = STATUT_COMPTEURS.get(statut)
+                if compteur:
+                    stats[compteur] += 1
+                if '🚨' in str(p.get('Alerte', '')):
+                    stats['urgents'] += 1
+                
+                if statut == 'Terminé':
+                    continue
+                if p.get('Priorité') == 1:
+                    critiques.append(p)
+                
+                if p['_deadline_epoch'] is not None and p['_deadline_epoch'] < today_epoch:
+                    retards.append(p)
             
             # Générer l'analyse avec l'agent
             rapport_context = f"""
@@ -578,8 +1261,10 @@ class AgentChefProjet:
             Fournis un résumé avec recommandations d'actions.
             """
             
-            rapport_analysis = self.agent_redacteur.generate_reply(
-                messages=[{"role": "user", "content": rapport_context}]
+            rapport_analysis = self._call(
+                'redacteur',
+                rapport_context,
+                cache=False  # Le rapport doit refléter l'état actuel
             )
             
             return {
@@ -609,31 +1294,25 @@ class AgentChefProjet:
                 "result": result[:500] + "..." if len(result) > 500 else result
             }
             
-            # Sauvegarder dans un fichier JSON
-            log_file = "research_log.json"
-            logs = []
-            
-            if os.path.exists(log_file):
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            
-            logs.append(log_entry)
+            # Ajouter l'entrée en fin de fichier JSONL
+            with open(RESEARCH_LOG_FILE, 'a', encoding='utf-8') as f:
+                f.write(_dumps(log_entry) + "\n")
             
-            # Garder seulement les 100 dernières recherches
-            if len(logs) > 100:
-                logs = logs[-100:]
-            
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, indent=2, ensure_ascii=False)
+            # Garder seulement les 100 dernières recherches, uniquement quand le fichier grossit trop
+            if os.path.getsize(RESEARCH_LOG_FILE) > RESEARCH_LOG_MAX_BYTES:
+                with open(RESEARCH_LOG_FILE, 'r', encoding='utf-8') as f:
+                    logs = deque(f, maxlen=RESEARCH_LOG_MAX_ENTRIES)
+                with open(RESEARCH_LOG_FILE, 'w', encoding='utf-8') as f:
+                    f.writelines(logs)
             
         except Exception as e:
             logger.error(f"❌ Erreur sauvegarde log : {e}")
     
     def refresh_projects_cache(self):
-        """Met à jour le cache des projets"""
+        """Force le rechargement du cache des projets"""
         try:
-            self.projects_cache = self.get_all_projects()
-            self.last_update = datetime.now()
+            self._cache_ts = None
+            self.get_all_projects()
         except Exception as e:
             logger.error(f"❌ Erreur refresh cache : {e}")
     
@@ -641,16 +1320,17 @@ class AgentChefProjet:
         """Démarre le système de surveillance automatique"""
         def monitor_projects():
             try:
-                # Vérifier les projets stagnants
-                projects = self.get_all_projects()
+                # Vérifier les projets stagnants (rafraîchit le cache si nécessaire)
+                _, df = self.get_projects_snapshot()
                 alerts = []
                 
-                for project in projects:
-                    if project.get('Statut') not in ['Terminé', 'Annulé']:
-                        # Vérifier la stagnation
-                        jours_stagnation = project.get('Jours_Stagnation', 0)
-                        if isinstance(jours_stagnation, (int, float)) and jours_stagnation > 7:
-                            alerts.append(f"⚠ {project['Nom_Projet']} : {jours_stagnation} jours sans mise à jour")
+                if not df.empty:
+                    mask = (~df['Statut'].isin(['Terminé', 'Annulé'])) & (df['Jours_Stagnation'] > 7)
+                    alerts = (
+                        '⚠ ' + df.loc[mask, 'Nom_Projet'].astype(str)
+                        + ' : ' + df.loc[mask, 'Jours_Stagnation'].map('{:g}'.format)
+                        + ' jours sans mise à jour'
+                    ).tolist()
                 
                 if alerts:
                     alert_message = "\n".join(alerts)
@@ -665,34 +1345,99 @@ class AgentChefProjet:
         # Programmer les vérifications
         schedule.every(24).hours.do(monitor_projects)
         
-        # Lancer le thread de surveillance
+        # Lancer le thread de surveillance : il ne se réveille qu'à la prochaine échéance
         def run_scheduler():
             while True:
+                next_run = schedule.idle_seconds()
+                if next_run is None:
+                    break
+                if next_run > 0:
+                    # Dormir jusqu'à la prochaine tâche due (aucun réveil intermédiaire)
+                    time.sleep(next_run)
                 schedule.run_pending()
-                time.sleep(3600)  # Vérifier toutes les heures
         
         monitoring_thread = threading.Thread(target=run_scheduler, daemon=True)
         monitoring_thread.start()
         
         logger.info("🔄 Système de surveillance démarré")
     
+    def _cache_free_form(self) -> bool:
+        """
+        Indique si les réponses libres peuvent être mises en cache
+        
+        Le rédacteur (température 0.7) n'est pas reproductible : cache seulement
+        sur activation explicite, via la clé "cache_free_form" de la config ou
+        la variable d'environnement LLM_CACHE=1 (lue à chaque appel).
+        """
+        if "cache_free_form" in self.config:
+            return bool(self.config["cache_free_form"])
+        return os.getenv("LLM_CACHE") == "1"
+    
+    def _ask_free_form(self, user_input: str) -> str:
+        """Répond à une requête libre avec l'agent rédacteur"""
+        return self._call(
+            'redacteur',
+            f"""
+            L'utilisateur demande : {user_input}
+            
+            Contexte : Tu es l'assistant chef de projet. L'utilisateur peut :
+            - Poser des questions sur ses projets
+            - Demander des conseils en gestion de projet
+            - Chercher de l'aide pour organiser son travail
+            - Demander des analyses ou recommandations
+            
+            Projets actuels : {len(self.get_all_projects())} projets en cours
+            
+            Réponds de manière utile et actionnable.
+            """,
+            cache=self._cache_free_form()
+        )
+    
+    def _print_projects(self):
+        """Affiche la liste de tous les projets"""
+        projects = self.get_all_projects()
+        print(f"\n📋 Tous les projets ({len(projects)}) :")
+        for i, projet in enumerate(projects, 1):
+            statut = getattr(projet, 'Statut', '')
+            status_emoji = STATUS_EMOJI.get(statut, "❓")
+            print(f"{i}. {status_emoji} {getattr(projet, 'Nom_Projet', '')} - {statut}")
+    
+    def _handle_intent(self, intent: str):
+        """Répond localement aux intentions simples du chat (aide, liste, statut)"""
+        if intent in ('aide', 'help'):
+            print(f"\n{AIDE_CHAT}")
+        elif intent == 'liste':
+            self._print_projects()
+        elif intent == 'statut':
+            counts = dict.fromkeys(STATUT_COMPTEURS, 0)
+            for projet in self.get_all_projects():
+                statut = getattr(projet, 'Statut', None)
+                if statut in counts:
+                    counts[statut] += 1
+            print("\n📊 " + " | ".join(f"{statut} : {n}" for statut, n in counts.items()))
+    
     def chat_interface(self):
         """Interface de chat interactive"""
         print("\n" + "="*60)
         print("🤖 AGENT IA CHEF DE PROJET")
         print("="*60)
-        print("Commandes disponibles :")
-        print("- rechercher [query] : Rechercher des informations")
-        print("- ajouter : Ajouter un nouveau projet")
-        print("- projet [nom] : Chercher un projet spécifique")
-        print("- rapport : Générer un rapport quotidien")
-        print("- projets : Lister tous les projets")
-        print("- quit : Quitter")
+        print(AIDE_CHAT)
         print("="*60)
         
+        # Les alertes des autres threads s'affichent au-dessus du prompt sans le casser
+        session = PromptSession()
+        with patch_stdout(raw=True):
+            previous_stream = _log_handler.setStream(sys.stderr)
+            try:
+                self._chat_loop(session)
+            finally:
+                _log_handler.setStream(previous_stream)
+    
+    def _chat_loop(self, session: PromptSession):
+        """Boucle de lecture des commandes du chat"""
         while True:
             try:
-                user_input = input("\n🎯 Votre demande : ").strip()
+                user_input = session.prompt("\n🎯 Votre demande : ").strip()
                 
                 if user_input.lower() == 'quit':
                     print("👋 Au revoir !")
@@ -701,7 +1446,7 @@ class AgentChefProjet:
                 elif user_input.lower().startswith('rechercher '):
                     query = user_input[11:]
                     print(f"\n🔍 Recherche en cours : {query}")
-                    result = self.rechercher_information(query)
+                    result = asyncio.run(self.rechercher_information(query))
                     if result['status'] == 'success':
                         print(f"\n📊 Résultat :\n{result['final_synthesis']}")
                     else:
@@ -709,11 +1454,11 @@ class AgentChefProjet:
                 
                 elif user_input.lower() == 'ajouter':
                     print("\n📝 Ajout d'un nouveau projet")
-                    nom = input("Nom du projet : ")
-                    description = input("Description : ")
-                    priorite = input("Priorité (1-4) : ")
-                    deadline = input("Deadline (YYYY-MM-DD) : ")
-                    notes = input("Notes : ")
+                    nom = session.prompt("Nom du projet : ")
+                    description = session.prompt("Description : ")
+                    priorite = session.prompt("Priorité (1-4) : ")
+                    deadline = session.prompt("Deadline (YYYY-MM-DD) : ")
+                    notes = session.prompt("Notes : ")
                     
                     result = self.ajouter_projet(
                         nom, description, 
@@ -754,38 +1499,36 @@ class AgentChefProjet:
                         print(f"\n❌ Erreur : {rapport['error']}")
                 
                 elif user_input.lower() == 'projets':
-                    projects = self.get_all_projects()
-                    print(f"\n📋 Tous les projets ({len(projects)}) :")
-                    for i, projet in enumerate(projects, 1):
-                        status_emoji = {"En cours": "🔄", "À faire": "📋", "Terminé": "✅", "Bloqué": "🚫"}.get(projet['Statut'], "❓")
-                        print(f"{i}. {status_emoji} {projet['Nom_Projet']} - {projet['Statut']}")
+                    self._print_projects()
+                
+                elif intent := CHAT_INTENT_RE.match(user_input):
+                    # Intentions courantes : réponse locale immédiate, sans modèle
+                    self._handle_intent(intent.group(1).lower())
                 
                 else:
                     # Requête libre - analyser avec l'agent
                     print(f"\n🤖 Traitement de votre demande...")
-                    result = self.agent_redacteur.generate_reply(
-                        messages=[{"role": "user", "content": f"""
-                        L'utilisateur demande : {user_input}
-                        
-                        Contexte : Tu es l'assistant chef de projet. L'utilisateur peut :
-                        - Poser des questions sur ses projets
-                        - Demander des conseils en gestion de projet
-                        - Chercher de l'aide pour organiser son travail
-                        - Demander des analyses ou recommandations
-                        
-                        Projets actuels : {len(self.get_all_projects())} projets en cours
-                        
-                        Réponds de manière utile et actionnable.
-                        """}]
-                    )
+                    # La réponse dépend du nombre de projets (inclus dans le prompt)
+                    scope = f"chef_projet:n_proj={len(self.get_all_projects())}"
+                    result = self._semantic_cache.get(user_input, scope) if self._semantic_cache else None
+                    if result is None:
+                        result = self._ask_free_form(user_input)
+                        if self._semantic_cache and result:
+                            self._semantic_cache.set(user_input, result, scope)
                     print(f"\n💡 Réponse :\n{result}")
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n👋 Au revoir !")
                 break
+            except (requests.Timeout, openai.APIError) as e:
+                print("\n⏳ Service indisponible ou trop lent, réessayez dans un instant.")
+                logger.warning("Erreur réseau/LLM dans le chat : %s", e)
+            except (KeyError, ValueError) as e:
+                print(f"\n❌ Donnée invalide : {e}")
+                logger.debug("Erreur de saisie dans le chat : %s", e)
             except Exception as e:
                 print(f"\n❌ Erreur : {e}")
-                logger.error(f"Erreur dans le chat : {e}")
+                logger.error("Erreur dans le chat : %s", e)
 
 
 def main():
@@ -820,71 +1563,173 @@ def create_sample_config():
             "check_interval_hours": 24,
             "stagnation_alert_days": 7,
             "urgent_alert_days": 14
+        },
+        "semantic_cache": {
+            "redis_url": "redis://localhost:6379/0",
+            "threshold": 0.92,
+            "ttl_seconds": 3600
         }
     }
     
     with open("config_example.json", "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+        f.write(_dumps(config, indent=True))
     
     print("📝 Fichier config_example.json créé")
 
 
 # Fonctions utilitaires supplémentaires
+def projects_to_arrays(projects: List[Any]):
+    """
+    Extrait les colonnes utiles au score de santé sous forme de tableaux NumPy
+
+    Les lignes de projet (namedtuple) sont lues par attribut, avec une
+    valeur par défaut si la colonne manque dans la feuille.
+
+    Les valeurs non numériques sont neutralisées (NaN : aucune pénalité,
+    comme dans _score_project) et une deadline absente vaut -1. Les jours
+    de stagnation restent flottants (14.5 > 14).
+
+    Returns:
+        (stagnation float64, progression float64, statut_code int8, deadline_epoch int64)
+    """
+    n = len(projects)
+    stagnation = np.full(n, np.nan, dtype=np.float64)
+    progression = np.full(n, np.nan, dtype=np.float64)
+    statut_code = np.full(n, -1, dtype=np.int8)
+    deadline_epoch = np.full(n, -1, dtype=np.int64)
+
+    for i, p in enumerate(projects):
+        value = getattr(p, 'Jours_Stagnation', 0)
+        if isinstance(value, (int, float)):
+            stagnation[i] = value
+        value = getattr(p, 'Progression_pct', 0)
+        if isinstance(value, (int, float)):
+            progression[i] = value
+        statut_code[i] = STATUT_CODES.get(getattr(p, 'Statut', None), -1)
+        deadline = p.deadline_epoch
+        if deadline is not None:
+            deadline_epoch[i] = deadline
+    
+    return stagnation, progression, statut_code, deadline_epoch
+
+
+def compute_health_scores(stagnation: np.ndarray, progression: np.ndarray,
+                          statut_code: np.ndarray, deadline_epoch: np.ndarray,
+                          today_epoch: int):
+    """
+    Calcule en une passe vectorisée les scores de santé de tous les projets
+
+    Applique les mêmes règles que ProjectAnalyzer._score_project (seuils et
+    pénalités partagés), score ramené à 0 au minimum.
+
+    Returns:
+        (scores int32, drapeaux uint8 combinant les constantes HEALTH_*)
+    """
+    flags = np.zeros(len(stagnation), dtype=np.uint8)
+    flags[stagnation > STAGNATION_CRITIQUE_JOURS] |= HEALTH_STAGNATION_CRITIQUE
+    flags[(stagnation > STAGNATION_MODEREE_JOURS) & (stagnation <= STAGNATION_CRITIQUE_JOURS)] |= HEALTH_STAGNATION_MODEREE
+    flags[statut_code == STATUT_CODES['Bloqué']] |= HEALTH_BLOQUE
+
+    has_deadline = deadline_epoch >= 0
+    days_remaining = deadline_epoch - today_epoch
+    flags[has_deadline & (days_remaining < 0)] |= HEALTH_RETARD
+    flags[has_deadline & (days_remaining >= 0) & (days_remaining <= DEADLINE_PROCHE_JOURS)] |= HEALTH_DEADLINE_PROCHE
+    flags[(progression < PROGRESSION_FAIBLE_PCT) & (statut_code == STATUT_CODES['En cours'])] |= HEALTH_PROGRESSION_FAIBLE
+
+    scores = np.full(len(flags), 100, dtype=np.int32)
+    for bit, penalty in HEALTH_PENALTIES.items():
+        scores -= np.where(flags & bit, penalty, 0).astype(np.int32)
+    return np.maximum(scores, 0), flags
+
+
 class ProjectAnalyzer:
     """Classe pour analyses avancées des projets"""
     
-    def _init_(self, agent_chef_projet):
-        self.agent = agent_chef_projet
+    def __init__(self, agent_chef_projet: "AgentChefProjet"):
+        self.agent: AgentChefProjet = agent_chef_projet
     
     def analyze_project_health(self, project_name: str) -> Dict[str, Any]:
-        """Analyse la santé d'un projet"""
+        """
+        Analyse la santé d'un projet
+        
+        Le résultat est mémorisé tant que la feuille n'a pas changé (révision)
+        et pour la journée en cours (les jours restants en dépendent).
+        """
+        return self.agent.cached_health(
+            project_name,
+            lambda today_epoch: self._analyze_project_health_uncached(project_name, today_epoch)
+        )
+    
+    def _analyze_project_health_uncached(self, project_name: str, today_epoch: int) -> Dict[str, Any]:
+        """Recherche le projet puis calcule sa santé"""
         projects = self.agent.rechercher_projet(project_name)
         
         if not projects:
             return {"error": "Projet non trouvé"}
         
-        project = projects[0]
+        return self.analyze_project_health_from_dict(projects[0], today_epoch)
+    
+    def analyze_project_health_from_dict(self, project: Any,
+                                         today_epoch: Optional[int] = None) -> Dict[str, Any]:
+        """Analyse la santé d'un projet déjà chargé (sans nouvelle lecture de la feuille)"""
+        return self._score_project(project, today_epoch)
+    
+    def _score_project(self, project: Any, today_epoch: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Calcule le score de santé d'un projet à partir de sa seule ligne
+        
+        Fonction pure : aucune lecture de la feuille. Chaque colonne utile
+        n'est lue qu'une fois (par attribut), et la deadline déjà convertie
+        au chargement (deadline_epoch) est réutilisée.
+        
+        Args:
+            project: Ligne du projet (namedtuple issu de get_all_projects)
+            today_epoch: Jour courant (date.toordinal), à calculer une fois par
+                rapport quand plusieurs projets sont analysés
+        """
+        if today_epoch is None:
+            today_epoch = date.today().toordinal()
+        
+        # Colonnes absentes de la feuille : valeurs par défaut
+        project_name = getattr(project, 'Nom_Projet', '')
+        statut = getattr(project, 'Statut', None)
+        jours_stagnation = getattr(project, 'Jours_Stagnation', 0)
+        progression = getattr(project, 'Progression_pct', 0)
+        deadline_epoch = project.deadline_epoch
         
         # Calculer les métriques
         health_score = 100
         issues = []
         
         # Vérifier la stagnation
-        jours_stagnation = project.get('Jours_Stagnation', 0)
         if isinstance(jours_stagnation, (int, float)):
-            if jours_stagnation > 14:
-                health_score -= 30
+            if jours_stagnation > STAGNATION_CRITIQUE_JOURS:
+                health_score -= HEALTH_PENALTIES[HEALTH_STAGNATION_CRITIQUE]
                 issues.append(f"🚨 Stagnation critique: {jours_stagnation} jours")
-            elif jours_stagnation > 7:
-                health_score -= 15
+            elif jours_stagnation > STAGNATION_MODEREE_JOURS:
+                health_score -= HEALTH_PENALTIES[HEALTH_STAGNATION_MODEREE]
                 issues.append(f"⚠ Stagnation modérée: {jours_stagnation} jours")
         
         # Vérifier le statut
-        if project.get('Statut') == 'Bloqué':
-            health_score -= 40
+        if statut == 'Bloqué':
+            health_score -= HEALTH_PENALTIES[HEALTH_BLOQUE]
             issues.append("🚫 Projet bloqué")
         
         # Vérifier la deadline
-        if project.get('Deadline'):
-            try:
-                deadline = datetime.strptime(project['Deadline'], '%Y-%m-%d').date()
-                today = datetime.now().date()
-                days_remaining = (deadline - today).days
-                
-                if days_remaining < 0:
-                    health_score -= 50
-                    issues.append(f"📅 En retard de {abs(days_remaining)} jours")
-                elif days_remaining <= 3:
-                    health_score -= 20
-                    issues.append(f"⏰ Deadline dans {days_remaining} jours")
-            except ValueError:
-                pass
+        if deadline_epoch is not None:
+            days_remaining = deadline_epoch - today_epoch
+            
+            if days_remaining < 0:
+                health_score -= HEALTH_PENALTIES[HEALTH_RETARD]
+                issues.append(f"📅 En retard de {abs(days_remaining)} jours")
+            elif days_remaining <= DEADLINE_PROCHE_JOURS:
+                health_score -= HEALTH_PENALTIES[HEALTH_DEADLINE_PROCHE]
+                issues.append(f"⏰ Deadline dans {days_remaining} jours")
         
         # Vérifier la progression
-        progression = project.get('Progression_%', 0)
         if isinstance(progression, (int, float)):
-            if progression < 25 and project.get('Statut') == 'En cours':
-                health_score -= 10
+            if progression < PROGRESSION_FAIBLE_PCT and statut == 'En cours':
+                health_score -= HEALTH_PENALTIES[HEALTH_PROGRESSION_FAIBLE]
                 issues.append("📊 Progression faible")
         
         # Déterminer le niveau de santé
@@ -907,92 +1752,112 @@ class ProjectAnalyzer:
     
     def generate_recommendations(self, project: Dict, issues: List[str]) -> List[str]:
         """Génère des recommandations basées sur les problèmes détectés"""
-        recommendations = []
-        
-        if any("stagnation" in issue.lower() for issue in issues):
-            recommendations.append("📞 Planifier une réunion d'équipe pour débloquer le projet")
-            recommendations.append("🔄 Revoir les objectifs et priorités")
-        
-        if any("bloqué" in issue.lower() for issue in issues):
-            recommendations.append("🚫 Identifier les blocages et les ressources nécessaires")
-            recommendations.append("🤝 Escalader auprès des parties prenantes")
+        # Un seul passage sur les problèmes : chaque type détecté lève un bit
+        flags = 0
+        for issue in issues:
+            il = issue.lower()
+            flags |= ((1 if "stagnation" in il else 0) | (2 if "bloqué" in il else 0)
+                      | (4 if "retard" in il else 0) | (8 if "progression" in il else 0))
         
-        if any("retard" in issue.lower() for issue in issues):
-            recommendations.append("⏱ Revoir le planning et les livrables")
-            recommendations.append("📊 Prioriser les tâches critiques")
-        
-        if any("progression" in issue.lower() for issue in issues):
-            recommendations.append("🎯 Décomposer en sous-tâches plus petites")
-            recommendations.append("📈 Définir des jalons intermédiaires")
+        recommendations = []
+        if flags & 1:
+            recommendations.extend(STAGNATION_RECS)
+        if flags & 2:
+            recommendations.extend(BLOCAGE_RECS)
+        if flags & 4:
+            recommendations.extend(RETARD_RECS)
+        if flags & 8:
+            recommendations.extend(PROGRESSION_RECS)
         
         return recommendations
 
 
+# Modèle du rapport Markdown et valeurs par défaut des champs absents
+_MD_TEMPLATE = """# Rapport de Gestion de Projets
+
+## 📊 Vue d'ensemble
+
+- *Période*: {periode}
+- *Total des projets*: {total_projects}
+- *Projets actifs*: {active_projects}
+- *Projets terminés*: {completed_projects}
+- *Progression moyenne*: {average_progression}%
+
+## 🚨 Projets à risque
+
+{at_risk_projects} projets nécessitent une attention particulière.
+
+## 📈 Métriques clés
+
+- *Taux de completion*: {completion_rate}%
+- *Score d'efficacité*: {efficiency_score}%
+
+---
+Rapport généré le {now}
+"""
+
+_MD_DEFAULTS = {
+    'periode': 'N/A',
+    'total_projects': 0,
+    'active_projects': 0,
+    'completed_projects': 0,
+    'average_progression': 0,
+    'at_risk_projects': 0,
+    'completion_rate': 0,
+    'efficiency_score': 0,
+}
+
+
 class ReportGenerator:
     """Générateur de rapports avancés"""
     
-    def _init_(self, agent_chef_projet):
-        self.agent = agent_chef_projet
+    def __init__(self, agent_chef_projet: "AgentChefProjet"):
+        self.agent: AgentChefProjet = agent_chef_projet
     
     def generate_weekly_report(self) -> Dict[str, Any]:
         """Génère un rapport hebdomadaire"""
-        projects = self.agent.get_all_projects()
+        projects, df = self.agent.get_projects_snapshot()
         
-        # Analyse des tendances
-        active_projects = [p for p in projects if p.get('Statut') in ['En cours', 'À faire']]
-        completed_this_week = [p for p in projects if p.get('Statut') == 'Terminé']
+        # Analyse des tendances : masques booléens sur les colonnes typées
+        statut = df.get('Statut', pd.Series(index=df.index, dtype=object))
+        progression = df.get('Progression_%', pd.Series(0.0, index=df.index))
+        active_mask = statut.isin(['En cours', 'À faire']).to_numpy()
+        n_active = int(active_mask.sum())
+        n_completed = int((statut == 'Terminé').sum())
+        active_projects = [projects[i] for i in np.flatnonzero(active_mask)]
         
         # Calcul des métriques
-        total_progression = sum(p.get('Progression_%', 0) for p in active_projects)
-        avg_progression = total_progression / len(active_projects) if active_projects else 0
+        avg_progression = float(progression[active_mask].mean()) if n_active else 0
         
-        # Projets à risque
-        at_risk_projects = []
-        for project in active_projects:
-            analyzer = ProjectAnalyzer(self.agent)
-            health = analyzer.analyze_project_health(project['Nom_Projet'])
-            if health.get('health_score', 100) < 60:
-                at_risk_projects.append(project)
+        # Projets à risque : scores calculés en une seule passe vectorisée
+        scores, _ = compute_health_scores(
+            *projects_to_arrays(active_projects), date.today().toordinal()
+        )
+        at_risk_projects = [p for p, score in zip(active_projects, scores) if score < 60]
         
         return {
             "periode": f"Semaine du {datetime.now().strftime('%Y-%m-%d')}",
             "total_projects": len(projects),
-            "active_projects": len(active_projects),
-            "completed_projects": len(completed_this_week),
+            "active_projects": n_active,
+            "completed_projects": n_completed,
             "average_progression": round(avg_progression, 1),
             "at_risk_projects": len(at_risk_projects),
-            "at_risk_details": at_risk_projects[:5],  # Top 5 des projets à risque
+            "at_risk_details": [p.to_dict() for p in at_risk_projects[:5]],  # Top 5 des projets à risque
             "key_metrics": {
-                "completion_rate": round(len(completed_this_week) / len(projects) * 100, 1) if projects else 0,
-                "efficiency_score": round(avg_progression / len(active_projects) * 100, 1) if active_projects else 0
+                "completion_rate": round(n_completed / len(projects) * 100, 1) if projects else 0,
+                "efficiency_score": round(avg_progression / n_active * 100, 1) if n_active else 0
             }
         }
     
     def export_to_markdown(self, report_data: Dict[str, Any]) -> str:
         """Exporte un rapport en format Markdown"""
-        md_content = f"""# Rapport de Gestion de Projets
-
-## 📊 Vue d'ensemble
-
-- *Période*: {report_data.get('periode', 'N/A')}
-- *Total des projets*: {report_data.get('total_projects', 0)}
-- *Projets actifs*: {report_data.get('active_projects', 0)}
-- *Projets terminés*: {report_data.get('completed_projects', 0)}
-- *Progression moyenne*: {report_data.get('average_progression', 0)}%
-
-## 🚨 Projets à risque
-
-{report_data.get('at_risk_projects', 0)} projets nécessitent une attention particulière.
-
-## 📈 Métriques clés
-
-- *Taux de completion*: {report_data.get('key_metrics', {}).get('completion_rate', 0)}%
-- *Score d'efficacité*: {report_data.get('key_metrics', {}).get('efficiency_score', 0)}%
-
----
-Rapport généré le {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        return md_content
+        view = {
+            **_MD_DEFAULTS,
+            **report_data,
+            **report_data.get('key_metrics', {}),
+            'now': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        return _MD_TEMPLATE.format_map(view)
 
 
 # Script d'installation automatique
@@ -1000,22 +1865,37 @@ def install_dependencies():
     """Installe les dépendances nécessaires"""
     import subprocess
     import sys
+    from importlib.util import find_spec
     
-    dependencies = [
-        "autogen-agentchat",
-        "gspread",
-        "oauth2client",
-        "schedule",
-        "requests"
-    ]
+    # Paquet pip -> module importé (pour ignorer ceux déjà installés)
+    # autogen-agentchat 0.4+ ne fournit plus autogen.OpenAIWrapper : version 0.2
+    dependencies = {
+        "autogen-agentchat~=0.2": "autogen",
+        "gspread": "gspread",
+        "oauth2client": "oauth2client",
+        "schedule": "schedule",
+        "requests": "requests",
+        "numpy": "numpy",
+        "pandas": "pandas",
+        "prompt_toolkit": "prompt_toolkit",
+        "orjson": "orjson"
+    }
     
-    print("📦 Installation des dépendances...")
-    for dep in dependencies:
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", dep])
-            print(f"✅ {dep} installé")
-        except subprocess.CalledProcessError:
-            print(f"❌ Erreur installation {dep}")
+    missing = [dep for dep, module in dependencies.items() if find_spec(module) is None]
+    if not missing:
+        print("✅ Toutes les dépendances sont déjà installées")
+        return
+    
+    # Une seule invocation de pip : les dépendances sont résolues ensemble
+    print(f"📦 Installation des dépendances : {', '.join(missing)}")
+    try:
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install",
+            "--disable-pip-version-check", "-q", *missing
+        ])
+        print("✅ Dépendances installées")
+    except subprocess.CalledProcessError:
+        print("❌ Erreur lors de l'installation des dépendances")
 
 
 if __name__ == "__main__":
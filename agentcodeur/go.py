@@ -1,10 +1,20 @@
 import logging
 import os
 import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 from dotenv import load_dotenv
 import autogen
+import httpx
 
 # 📦 1. Charger variables d'environnement (.env pour OpenRouter et Telegram)
 load_dotenv()
@@ -12,6 +22,17 @@ load_dotenv()
 # 🔐 2. Récupérer le TOKEN TELEGRAM depuis l'environnement
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 
+# 🔌 Client HTTP partagé : connexions keep-alive réutilisées vers OpenRouter
+# (AutoGen copie la configuration : __deepcopy__ conserve le même client)
+class ClientHTTPPartage(httpx.Client):
+    def __deepcopy__(self, memo):
+        return self
+
+http_client = ClientHTTPPartage(
+    limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+    timeout=60
+)
+
 # 📡 3. Configuration DeepSeek (via OpenRouter)
 config_deepseek = {
     "config_list": [
@@ -22,7 +43,10 @@ config_deepseek = {
             "headers": {
                 "HTTP-Referer": "https://localhost",  # Obligatoire OpenRouter
                 "X-Title": "BotTelegramCodeur"
-            }
+            },
+            # Prompt caching : le system_message statique est réutilisé côté fournisseur
+            "extra_body": {"cache_control": {"type": "ephemeral"}},
+            "http_client": http_client
         }
     ],
     "temperature": 0.5,
@@ -31,58 +55,277 @@ config_deepseek = {
 }
 
 # 🧠 4. Définir ton agent IA
-agent_codeur = autogen.AssistantAgent(
-    name="CodeurDeepSeek",
-    system_message="""
+SYSTEM_MESSAGE_CODEUR = """
     Tu es un assistant IA expert en programmation. 
     Tu génères du code (Python, JS, HTML...) et tu expliques tout clairement.
     Tu réponds toujours en français, avec des commentaires dans le code.
-    """,
-    llm_config=config_deepseek
-)
+    """
 
-# 👤 Agent utilisateur Telegram
-user_proxy = autogen.UserProxyAgent(
-    name="UtilisateurTelegram",
-    human_input_mode="NEVER",
-    max_consecutive_auto_reply=1,
-    code_execution_config=False
-)
+# 🧩 Paire d'agents neuve par requête : initiate_chat écrit l'historique
+# dans les deux agents, une paire partagée mélangerait les conversations
+# traitées en parallèle par LLM_POOL
+def creer_agents():
+    agent_codeur = autogen.AssistantAgent(
+        name="CodeurDeepSeek",
+        system_message=SYSTEM_MESSAGE_CODEUR,
+        llm_config=config_deepseek
+    )
+    user_proxy = autogen.UserProxyAgent(
+        name="UtilisateurTelegram",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=1,
+        code_execution_config=False
+    )
+    return user_proxy, agent_codeur
+
+# 🗃 Cache LRU des réponses (seulement si les réponses sont reproductibles :
+# température à 0, ou activation explicite via LLM_CACHE=1)
+class LLMCache:
+    def __init__(self, maxsize=512, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+CACHE_ACTIF = config_deepseek["temperature"] == 0 or os.getenv("LLM_CACHE") == "1"
+cache_reponses = LLMCache(maxsize=512, ttl=3600)
 
-# 📩 Fonction de réponse aux messages
-async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    question = update.message.text
-    print(f"📩 Message reçu : {question}")
 
+def cle_cache(question):
+    return hashlib.sha256(json.dumps({
+        "model": config_deepseek["config_list"][0]["model"],
+        "sys": SYSTEM_MESSAGE_CODEUR,
+        "user": question,
+    }, sort_keys=True).encode()).hexdigest()
+
+# 🧭 Cache sémantique optionnel (Redis + RediSearch) : une question reformulée
+# (similarité cosinus >= 0.92) réutilise la réponse déjà générée.
+# Même implémentation que agent_projet.py (entrées séparées par portée) ;
+# les erreurs Redis sont journalisées et traitées comme un cache vide.
+# Activé si REDIS_URL est défini (dépendances : redis, sentence-transformers)
+PORTEE_CACHE = "codeur"
+
+class SemanticCache:
+    INDEX = "idx:semantic_cache:v2"
+    PREFIX = "semcache:v2:"
+    DIM = 384
+
+    def __init__(self, redis_url, threshold=0.92, ttl=3600):
+        import redis
+        from sentence_transformers import SentenceTransformer
+
+        self.threshold = threshold
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(redis_url)
+        self._model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        self._ensure_index()
+
+    def _ensure_index(self):
+        from redis.exceptions import ResponseError
+        from redis.commands.search.field import TagField, TextField, VectorField
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+
+        try:
+            self._redis.ft(self.INDEX).info()
+        except ResponseError:
+            self._redis.ft(self.INDEX).create_index(
+                [
+                    TagField("scope"),
+                    TextField("response"),
+                    VectorField("vec", "HNSW", {"TYPE": "FLOAT32", "DIM": self.DIM, "DISTANCE_METRIC": "COSINE"}),
+                ],
+                definition=IndexDefinition(prefix=[self.PREFIX], index_type=IndexType.HASH)
+            )
+
+    def _embed(self, text):
+        return self._model.encode(text, normalize_embeddings=True).astype("float32").tobytes()
+
+    @staticmethod
+    def _scope_tag(scope):
+        return hashlib.blake2b(scope.encode("utf-8"), digest_size=8).hexdigest()
+
+    def get(self, text, scope=""):
+        from redis.commands.search.query import Query
+
+        try:
+            query = (
+                Query("@scope:{$scope} @vec:[VECTOR_RANGE $radius $vec]=>{$YIELD_DISTANCE_AS: dist}")
+                .sort_by("dist")
+                .return_fields("response", "dist")
+                .paging(0, 1)
+                .dialect(2)
+            )
+            result = self._redis.ft(self.INDEX).search(
+                query, query_params={
+                    "scope": self._scope_tag(scope), "radius": 1 - self.threshold, "vec": self._embed(text)
+                }
+            )
+            if not result.docs:
+                return None
+            response = result.docs[0].response
+            return response.decode("utf-8") if isinstance(response, bytes) else response
+        except Exception as e:
+            print("Erreur cache sémantique:", e)
+            return None
+
+    def set(self, text, response, scope=""):
+        try:
+            tag = self._scope_tag(scope)
+            key = self.PREFIX + tag + ":" + hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            self._redis.hset(key, mapping={"scope": tag, "vec": self._embed(text), "response": response, "ts": time.time()})
+            self._redis.expire(key, self.ttl)
+        except Exception as e:
+            print("Erreur cache sémantique:", e)
+
+
+cache_semantique = None
+if os.getenv("REDIS_URL"):
+    try:
+        cache_semantique = SemanticCache(os.getenv("REDIS_URL"))
+    except Exception as e:
+        print("⚠ Cache sémantique désactivé :", e)
+
+# 🧵 Pool dédié aux appels LLM bloquants + limite d'appels simultanés :
+# les commandes (/start...) restent réactives même en cas d'afflux
+LLM_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm")
+LLM_SLOTS = asyncio.Semaphore(8)
+ATTENTE_MAX_SLOT = 2  # secondes
+
+# 🔁 Routage par conversation : une paire d'agents par chat Telegram, réutilisée
+# d'une question à l'autre (historique remis à zéro) et verrouillée pour que
+# deux messages du même chat ne s'entremêlent pas ; chats distincts en parallèle
+MAX_CONVERSATIONS = 256
+_conversations = OrderedDict()
+_conversations_lock = threading.Lock()
+
+
+def _paire_conversation(chat_id):
+    with _conversations_lock:
+        paire = _conversations.get(chat_id)
+        if paire is None:
+            paire = (*creer_agents(), threading.Lock())
+            _conversations[chat_id] = paire
+            if len(_conversations) > MAX_CONVERSATIONS:
+                _conversations.popitem(last=False)
+        else:
+            _conversations.move_to_end(chat_id)
+        return paire
+
+
+def _INITIATE(chat_id, message):
+    user_proxy, agent_codeur, verrou = _paire_conversation(chat_id)
+    with verrou:
+        return user_proxy.initiate_chat(agent_codeur, message=message, clear_history=True)
+
+# ✉ Envoi des réponses : morceaux de 4000 caractères (limite Telegram),
+# fichier joint au-delà de 3 morceaux pour éviter une série d'envois
+TAILLE_MORCEAU = 4000
+MAX_MORCEAUX = 3
+
+async def envoyer_reponse(update: Update, contenu):
+    if len(contenu) > MAX_MORCEAUX * TAILLE_MORCEAU:
+        await update.message.reply_document(document=io.BytesIO(contenu.encode("utf-8")), filename="reponse.md")
+        return
+    # Envois successifs (au plus 3) pour conserver l'ordre des morceaux
+    for i in range(0, len(contenu), TAILLE_MORCEAU):
+        await update.message.reply_text(contenu[i:i+TAILLE_MORCEAU])
+
+# 📩 Génère (ou retrouve en cache) la réponse à une question
+async def repondre(update: Update, question, utiliser_cache=True):
     try:
         loop = asyncio.get_running_loop()
-        resultat = await loop.run_in_executor(
-            None,
-            lambda: user_proxy.initiate_chat(
-                agent_codeur,
-                message=question,
-                clear_history=True
-            )
-        )
-        contenu = resultat.chat_history[-1]["content"]
+        cle = cle_cache(question)
+        contenu = cache_reponses.get(cle) if CACHE_ACTIF and utiliser_cache else None
+
+        if contenu is None and cache_semantique and utiliser_cache:
+            contenu = await loop.run_in_executor(None, cache_semantique.get, question, PORTEE_CACHE)
+
+        if contenu is None:
+            try:
+                await asyncio.wait_for(LLM_SLOTS.acquire(), timeout=ATTENTE_MAX_SLOT)
+            except asyncio.TimeoutError:
+                await update.message.reply_text("⏳ File d'attente pleine, réessaie dans un instant.")
+                return
+            try:
+                resultat = await loop.run_in_executor(
+                    LLM_POOL, functools.partial(_INITIATE, update.effective_chat.id, question)
+                )
+            finally:
+                LLM_SLOTS.release()
+            contenu = resultat.chat_history[-1]["content"]
+            if CACHE_ACTIF:
+                cache_reponses.set(cle, contenu)
+            if cache_semantique:
+                await loop.run_in_executor(None, cache_semantique.set, question, contenu, PORTEE_CACHE)
 
-        # Répondre en morceaux si c'est trop long
-        for i in range(0, len(contenu), 4000):
-            await update.message.reply_text(contenu[i:i+4000])
+        await envoyer_reponse(update, contenu)
 
     except Exception as e:
         await update.message.reply_text("❌ Erreur lors de la génération.")
         print("Erreur:", e)
 
+# 💬 Messages simples traités sans appel au LLM
+INTENT_RE = re.compile(r'^\s*(salut|bonjour|merci|aide|help)\s*$', re.IGNORECASE)
+REPONSES_RAPIDES = {
+    "salut": "👋 Salut ! Pose-moi ta question de code.",
+    "bonjour": "👋 Bonjour ! Pose-moi ta question de code.",
+    "merci": "🙏 Avec plaisir !",
+    "aide": "💡 Envoie-moi une question de programmation (Python, JS, HTML...).\n/nocache <question> : forcer une nouvelle réponse",
+}
+REPONSES_RAPIDES["help"] = REPONSES_RAPIDES["aide"]
+
+# 📩 Fonction de réponse aux messages
+async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    question = update.message.text
+    print(f"📩 Message reçu : {question}")
+    if m := INTENT_RE.match(question):
+        return await update.message.reply_text(REPONSES_RAPIDES[m.group(1).lower()])
+    await repondre(update, question)
+
+# 🔄 Commande /nocache : force une nouvelle génération sans passer par les caches
+async def nocache(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    question = " ".join(context.args)
+    if not question:
+        await update.message.reply_text("Usage : /nocache <question>")
+        return
+    await repondre(update, question, utiliser_cache=False)
+
+# ❓ Commandes non reconnues (les handlers de commandes connues passent avant)
+async def commande_inconnue(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_text("❓ Commande inconnue. Essaie /start ou aide.")
+
 # 📥 Commande /start
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("👋 Bienvenue ! Pose-moi ta question de code.")
 
 # 🚀 Lancer le bot
 if __name__ == "__main__":
-    app = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    # Mises à jour traitées en parallèle : /start ne reste pas bloqué derrière
+    # un appel LLM, la limite vient de LLM_POOL / LLM_SLOTS
+    app = ApplicationBuilder().token(TELEGRAM_TOKEN).concurrent_updates(True).build()
     app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("nocache", nocache))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    app.add_handler(MessageHandler(filters.COMMAND, commande_inconnue))
 
     print("🤖 Ton bot Telegram est en ligne !")
     app.run_polling()
\ No newline at end of file
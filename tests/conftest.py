@@ -0,0 +1,36 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+MODULE_PATH = pathlib.Path(__file__).resolve().parents[1] / "agent_de_gestion_projrt.py" / "agent_projet.py"
+
+HEADERS = [
+    'Nom_Projet', 'Statut', 'Priorité', 'Description', 'Prochaine_Action',
+    'Deadline', 'Date_Creation', 'Dernière_MAJ', 'Jours_Stagnation',
+    'Alerte', 'Progression_%', 'Notes'
+]
+
+
+@pytest.fixture(scope="session")
+def agent_projet():
+    """Module agent_projet, chargé seulement si ses dépendances sont installées"""
+    for dep in ("numpy", "pandas", "autogen", "openai", "gspread", "oauth2client",
+                "schedule", "requests", "prompt_toolkit"):
+        pytest.importorskip(dep)
+    spec = importlib.util.spec_from_file_location("agent_projet", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def make_projects(agent_projet):
+    """Construit des lignes de projet (namedtuple) comme get_all_projects"""
+    def build(rows):
+        agent = agent_projet.AgentChefProjet.__new__(agent_projet.AgentChefProjet)
+        agent._headers = None
+        agent._project_cls = None
+        values = [[str(row.get(h, '')) for h in HEADERS] for row in rows]
+        return agent._materialize_projects([HEADERS] + values)
+    return build
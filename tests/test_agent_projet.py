@@ -0,0 +1,46 @@
+from datetime import date
+
+
+def test_analyzers_keep_a_reference_to_their_agent(agent_projet):
+    agent = agent_projet.AgentChefProjet.__new__(agent_projet.AgentChefProjet)
+    assert agent_projet.ProjectAnalyzer(agent).agent is agent
+    assert agent_projet.ReportGenerator(agent).agent is agent
+
+
+def test_fast_parse_ymd(agent_projet):
+    parse = agent_projet._fast_parse_ymd
+    assert parse('2026-01-15') == date(2026, 1, 15).toordinal()
+    assert parse('') is None
+    assert parse('15/01/2026') is None
+    assert parse('2026-1-15') is None
+    assert parse('2026-02-30') is None
+
+
+def test_compress_keeps_structured_lines(agent_projet):
+    text = "Intro\n## Risques\n  - retard\nblabla\n- budget"
+    assert agent_projet._compress(text) == "## Risques\n- retard\n- budget"
+    assert agent_projet._compress("texte libre") == "texte libre"
+    assert agent_projet._compress(None) == ""
+    assert agent_projet._compress("- " + "x" * 100, max_chars=10) == "- xxxxxxxx"
+
+
+def test_llm_cache_evicts_least_recently_used(agent_projet):
+    cache = agent_projet.LLMCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_llm_cache_expiry(agent_projet):
+    cache = agent_projet.LLMCache(maxsize=4, ttl=60)
+    now = agent_projet.time.time()
+    cache.set('ancien', 'x', timestamp=now - 120)
+    cache.set('recent', 'y', timestamp=now - 30)
+    assert cache.get('ancien') is None
+    assert cache.get('recent') == 'y'
+    assert cache.get('recent', ttl=10) is None
+    assert cache.get('recent') is None
@@ -0,0 +1,46 @@
+import itertools
+from datetime import date
+
+TODAY = date(2026, 1, 15).toordinal()
+
+STAGNATIONS = [float('nan'), 0, 7, 7.5, 8, 14, 14.5, 15, 'abc']
+STATUTS = ['En cours', 'À faire', 'Bloqué', 'Terminé']
+PROGRESSIONS = [float('nan'), 10, 24.9, 25, 'abc']
+DEADLINE_OFFSETS = [None, -1, 0, 3, 4]
+
+
+def test_vectorized_scores_match_scalar_scores(agent_projet, make_projects):
+    cases = list(itertools.product(STAGNATIONS, STATUTS, PROGRESSIONS, DEADLINE_OFFSETS))
+    projects = make_projects([
+        {
+            'Nom_Projet': f'P{i}',
+            'Statut': statut,
+            'Deadline': '' if offset is None else date.fromordinal(TODAY + offset).isoformat(),
+        }
+        for i, (_, statut, _, offset) in enumerate(cases)
+    ])
+    # Valeurs numériques injectées telles quelles (NaN, flottants, texte)
+    projects = [
+        p._replace(Jours_Stagnation=stagnation, Progression_pct=progression)
+        for p, (stagnation, _, progression, _) in zip(projects, cases)
+    ]
+
+    analyzer = agent_projet.ProjectAnalyzer(None)
+    scores, flags = agent_projet.compute_health_scores(
+        *agent_projet.projects_to_arrays(projects), TODAY
+    )
+
+    for project, case, score, flag in zip(projects, cases, scores, flags):
+        health = analyzer._score_project(project, TODAY)
+        assert int(score) == health['health_score'], case
+        assert bin(int(flag)).count('1') == len(health['issues']), case
+
+
+def test_fractional_stagnation_is_not_truncated(agent_projet, make_projects):
+    project, = make_projects([{'Nom_Projet': 'P', 'Statut': 'À faire'}])
+    project = project._replace(Jours_Stagnation=14.5)
+
+    _, flags = agent_projet.compute_health_scores(*agent_projet.projects_to_arrays([project]), TODAY)
+
+    assert flags[0] & agent_projet.HEALTH_STAGNATION_CRITIQUE
+    assert agent_projet.ProjectAnalyzer(None)._score_project(project, TODAY)['health_score'] == 70